@@ -62,12 +62,19 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     LOG_FILE: str = "app.log"
+    LOG_STRUCTURED: bool = True  # JSON записи вместо LOG_FORMAT
+    LOG_SUCCESS_SAMPLE_RATE: float = 1.0  # доля логов успешных запросов
 
     # Лимиты и ограничения
     RATE_LIMIT: int = 100  # запросов в минуту
     MAX_CONNECTIONS: int = 10
     TIMEOUT: int = 60  # секунды
 
+    # Дедлайны анализа (бюджет времени на запрос)
+    ANALYSIS_DEFAULT_TIMEOUT_MS: int = 20000  # если клиент не передал бюджет
+    ANALYSIS_MAX_TIMEOUT_MS: int = 60000  # верхняя граница бюджета клиента
+    ANALYSIS_DEADLINE_RESERVE_MS: int = 250  # запас на сборку ответа
+
     # Настройки API Amazon
     AMAZON_API_DELAY: float = 1.0  # задержка между запросами
     AMAZON_MAX_RETRIES: int = 3
@@ -77,6 +84,14 @@ class Settings(BaseSettings):
     STATIC_DIR: str = "static"
     TEMPLATE_DIR: str = "templates"
     UPLOAD_DIR: str = "uploads"
+    EXPORT_DIR: str = "exports"
+
+    # Настройки выгрузки истории анализов
+    EXPORT_ENABLED: bool = True
+    EXPORT_FORMAT: str = "parquet"  # parquet или arrow
+    EXPORT_CHUNK_SIZE: int = 5000  # строк в одном файле-части
+    EXPORT_COMPRESSION: str = "zstd"
+    EXPORT_FLUSH_INTERVAL: int = 60  # секунды между принудительными записями буфера
 
     # Email настройки (если понадобится)
     SMTP_HOST: str = "smtp.gmail.com"
@@ -88,6 +103,15 @@ class Settings(BaseSettings):
     CACHE_EXPIRE_TIME: int = 3600  # 1 час
     CACHE_PREFIX: str = "amazon_analyzer:"
 
+    # Настройки ценового анализа
+    PRICE_SWEEP_MAX_POINTS: int = 10000  # максимальный размер ценовой сетки
+    PRICE_SWEEP_MAX_ITEMS: int = 500  # максимум продуктов в одном запросе
+    PRICE_SWEEP_MAX_CELLS: int = 1000000  # максимум продуктов x точек в одном запросе
+    PRICE_SWEEP_MAX_PRICE: float = 1000000  # верхняя граница цены в сетке
+    PRICE_SWEEP_CACHE_SIZE: int = 1024  # количество кривых в кэше
+    PRICE_SWEEP_DEFAULT_COST_RATIO: float = 0.4  # себестоимость, если не указана
+    AMAZON_REFERRAL_FEE: float = 0.15  # комиссия Amazon с продажи
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding='utf-8',
@@ -157,7 +181,8 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 STATIC_DIR = ROOT_DIR / settings.STATIC_DIR
 TEMPLATE_DIR = ROOT_DIR / settings.TEMPLATE_DIR
 UPLOAD_DIR = ROOT_DIR / settings.UPLOAD_DIR
+EXPORT_DIR = ROOT_DIR / settings.EXPORT_DIR
 
 # Создаем необходимые директории
-for directory in [STATIC_DIR, TEMPLATE_DIR, UPLOAD_DIR]:
+for directory in [STATIC_DIR, TEMPLATE_DIR, UPLOAD_DIR, EXPORT_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
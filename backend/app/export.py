@@ -0,0 +1,343 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+import uuid
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from .config import settings, EXPORT_DIR
+from .models import AnalysisResponse, ProductCreate
+
+
+# Схема колонок истории анализов
+ANALYSIS_SCHEMA = pa.schema([
+    ("asin", pa.string()),
+    ("title", pa.string()),
+    ("price", pa.float64()),
+    ("currency", pa.string()),
+    ("rating", pa.float64()),
+    ("total_reviews", pa.int64()),
+    ("bsr_rank", pa.int64()),
+    ("bsr_category", pa.string()),
+    ("weight", pa.float64()),
+    ("length", pa.float64()),
+    ("width", pa.float64()),
+    ("height", pa.float64()),
+    ("competition_score", pa.float64()),
+    ("competition_level", pa.string()),
+    ("total_competitors", pa.int64()),
+    ("market_saturation", pa.float64()),
+    ("potential_profit_margin", pa.float64()),
+    ("recommended_price", pa.float64()),
+    ("estimated_monthly_sales", pa.int64()),
+    ("estimated_monthly_revenue", pa.float64()),
+    ("ai_summary", pa.string()),
+    ("ai_opportunities", pa.list_(pa.string())),
+    ("ai_risks", pa.list_(pa.string())),
+    ("ai_recommendations", pa.list_(pa.string())),
+    ("partial", pa.bool_()),
+    ("partial_sections", pa.list_(pa.string())),
+    ("analysis_date", pa.timestamp("us")),
+])
+
+FILE_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+DATASET_FORMATS = {"parquet": "parquet", "arrow": "ipc"}
+MANIFEST_NAME = "_manifest.json"
+MANIFEST_LOCK_NAME = "_manifest.lock"
+# Источник пакетной выгрузки по умолчанию (ключ отметки в манифесте)
+DEFAULT_EXPORT_SOURCE = "batch"
+
+logger = logging.getLogger(__name__)
+
+
+def flatten_analysis(product: ProductCreate, response: AnalysisResponse) -> Dict:
+    """Преобразование результата анализа в плоскую строку для колоночного хранения"""
+    dimensions = product.dimensions or {}
+    competition = response.competition_analysis
+    profit = response.profit_analysis
+    insights = response.ai_insights
+
+    return {
+        "asin": product.asin,
+        "title": product.title,
+        "price": product.price,
+        "currency": product.currency,
+        "rating": product.rating,
+        "total_reviews": product.total_reviews,
+        "bsr_rank": product.bsr_rank,
+        "bsr_category": product.bsr_category,
+        "weight": product.weight,
+        "length": dimensions.get("length"),
+        "width": dimensions.get("width"),
+        "height": dimensions.get("height"),
+        "competition_score": competition.score,
+        "competition_level": competition.level,
+        "total_competitors": competition.total_competitors,
+        "market_saturation": competition.market_saturation,
+        "potential_profit_margin": profit.potential_profit_margin,
+        "recommended_price": profit.recommended_price,
+        "estimated_monthly_sales": profit.estimated_monthly_sales,
+        "estimated_monthly_revenue": profit.estimated_monthly_revenue,
+        "ai_summary": insights.summary if insights else None,
+        "ai_opportunities": insights.opportunities if insights else None,
+        "ai_risks": insights.risks if insights else None,
+        "ai_recommendations": insights.recommendations if insights else None,
+        "partial": response.partial,
+        "partial_sections": response.partial_sections,
+        "analysis_date": response.analysis_date,
+    }
+
+
+class AnalysisExporter:
+    """
+    Потоковая выгрузка истории анализов в Parquet/Arrow файлы.
+    Строки копятся в колоночном буфере размером не больше chunk_size
+    и сбрасываются на диск отдельными файлами-частями, поэтому память
+    ограничена одним чанком, а каждая выгрузка только дописывает новые части.
+    Имена частей уникальны (время, pid, случайный суффикс), поэтому несколько
+    процессов могут писать в один EXPORT_DIR; манифест обновляется под файловой блокировкой.
+    Пакетные выгрузки (export) ведут свою отметку "выгружено до" по источнику
+    и не зависят от записей, которые сервер добавляет через record.
+    """
+
+    def __init__(
+        self,
+        export_dir: Optional[Path] = None,
+        file_format: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        compression: Optional[str] = None
+    ):
+        self.export_dir = Path(export_dir or EXPORT_DIR)
+        self.file_format = file_format or settings.EXPORT_FORMAT
+        if self.file_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported export format: {self.file_format}")
+        self.chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+        self.compression = compression or settings.EXPORT_COMPRESSION
+
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        self._buffer = self._empty_buffer()
+        self._buffered_rows = 0
+        self._lock = threading.Lock()
+        self._pending_writes: Set[asyncio.Task] = set()
+
+    def last_export_date(self, source: str = DEFAULT_EXPORT_SOURCE) -> Optional[datetime]:
+        """Дата последнего анализа, выгруженного пакетной выгрузкой из source (по манифесту на диске)"""
+        value = self._load_manifest().get("watermarks", {}).get(source)
+        return datetime.fromisoformat(value) if value else None
+
+    def add(self, product: ProductCreate, response: AnalysisResponse) -> Optional[Dict[str, List]]:
+        """
+        Добавление результата в буфер.
+        Возвращает заполненный буфер колонок, если пора записывать чанк.
+        """
+        row = flatten_analysis(product, response)
+        with self._lock:
+            for name, value in row.items():
+                self._buffer[name].append(value)
+            self._buffered_rows += 1
+            if self._buffered_rows >= self.chunk_size:
+                return self._take_buffer()
+        return None
+
+    def record(self, product: ProductCreate, response: AnalysisResponse) -> None:
+        """
+        Добавление результата из обработчика запроса.
+        Заполненный чанк записывается фоновой задачей в отдельном потоке,
+        запрос не ждет записи; незавершенные записи ожидаются в wait_pending_writes.
+        """
+        columns = self.add(product, response)
+        if columns is not None:
+            task = asyncio.create_task(asyncio.to_thread(self.write_columns, columns))
+            self._pending_writes.add(task)
+            task.add_done_callback(self._on_write_done)
+
+    def _on_write_done(self, task: asyncio.Task) -> None:
+        self._pending_writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Error writing analysis history: %s", task.exception())
+
+    async def wait_pending_writes(self) -> None:
+        """Ожидание фоновых записей чанков (при остановке сервера)"""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    async def run_periodic_flush(self, interval: float) -> None:
+        """Периодическая запись буфера, чтобы при малом трафике данные не залеживались в памяти"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error("Error flushing analysis history: %s", e)
+
+    def flush(self) -> Optional[Path]:
+        """Запись накопленного буфера на диск"""
+        with self._lock:
+            columns = self._take_buffer()
+        if columns is None:
+            return None
+        return self.write_columns(columns)
+
+    def export(
+        self,
+        analyses: Iterable[Tuple[ProductCreate, AnalysisResponse]],
+        source: str = DEFAULT_EXPORT_SOURCE
+    ) -> int:
+        """
+        Пакетная выгрузка потока результатов чанками.
+        Результаты, не новее последней выгрузки из того же source, пропускаются;
+        строки копятся в собственном буфере, отдельно от записей сервера.
+        Возвращает количество выгруженных строк.
+        """
+        since = self.last_export_date(source)
+        columns = self._empty_buffer()
+        rows = 0
+        exported = 0
+        for product, response in analyses:
+            if since and response.analysis_date <= since:
+                continue
+            for name, value in flatten_analysis(product, response).items():
+                columns[name].append(value)
+            rows += 1
+            exported += 1
+            if rows >= self.chunk_size:
+                self.write_columns(columns, source)
+                columns = self._empty_buffer()
+                rows = 0
+        if rows:
+            self.write_columns(columns, source)
+        return exported
+
+    def write_columns(self, columns: Dict[str, List], source: Optional[str] = None) -> Path:
+        """Сборка RecordBatch из буфера колонок и запись в новый файл-часть"""
+        return self.write_batch(pa.RecordBatch.from_pydict(columns, schema=ANALYSIS_SCHEMA), source)
+
+    def write_batch(self, batch: pa.RecordBatch, source: Optional[str] = None) -> Path:
+        """
+        Запись батча в новый файл-часть и обновление манифеста.
+        Для пакетной выгрузки source сдвигает ее отметку последней выгрузки.
+        """
+        path = self.export_dir / self._part_name()
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+
+        if self.file_format == "parquet":
+            pq.write_table(
+                pa.Table.from_batches([batch]),
+                tmp_path,
+                compression=self.compression
+            )
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            with pa.OSFile(str(tmp_path), "wb") as sink:
+                with pa.ipc.new_file(sink, ANALYSIS_SCHEMA, options=options) as writer:
+                    writer.write_batch(batch)
+        tmp_path.replace(path)
+
+        self._update_manifest(batch.num_rows, pc.max(batch.column("analysis_date")).as_py(), source)
+        return path
+
+    def _part_name(self) -> str:
+        """Уникальное имя части; сортировка по имени соответствует времени записи"""
+        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        return f"analyses-{timestamp}-{os.getpid()}-{uuid.uuid4().hex[:8]}.{FILE_EXTENSIONS[self.file_format]}"
+
+    def _take_buffer(self) -> Optional[Dict[str, List]]:
+        """Извлечение буфера колонок и его очистка (вызывается под блокировкой)"""
+        if not self._buffered_rows:
+            return None
+        columns = self._buffer
+        self._buffer = self._empty_buffer()
+        self._buffered_rows = 0
+        return columns
+
+    @staticmethod
+    def _latest(previous: Optional[str], last_date: Optional[datetime]) -> Optional[str]:
+        """Более поздняя из двух дат в формате ISO"""
+        if previous and (last_date is None or datetime.fromisoformat(previous) > last_date):
+            return previous
+        return last_date.isoformat() if last_date else None
+
+    @staticmethod
+    def _empty_buffer() -> Dict[str, List]:
+        return {name: [] for name in ANALYSIS_SCHEMA.names}
+
+    def _load_manifest(self) -> Dict:
+        path = self.export_dir / MANIFEST_NAME
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text())
+
+    def _update_manifest(self, rows: int, last_date: Optional[datetime], source: Optional[str] = None) -> None:
+        """Перечитывание и обновление манифеста под межпроцессной блокировкой"""
+        with open(self.export_dir / MANIFEST_LOCK_NAME, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                manifest = self._load_manifest()
+                watermarks = manifest.get("watermarks", {})
+                if source is not None:
+                    watermarks[source] = self._latest(watermarks.get(source), last_date)
+                manifest.update({
+                    "parts": manifest.get("parts", 0) + 1,
+                    "rows": manifest.get("rows", 0) + rows,
+                    "last_analysis_date": self._latest(manifest.get("last_analysis_date"), last_date),
+                    "watermarks": watermarks,
+                })
+                path = self.export_dir / MANIFEST_NAME
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(manifest))
+                tmp_path.replace(path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class AnalysisHistoryReader:
+    """
+    Чтение выгруженной истории анализов.
+    Файлы открываются через memory map, а сканирование идет
+    батчами с выборкой только нужных колонок.
+    """
+
+    def __init__(self, export_dir: Optional[Path] = None, file_format: Optional[str] = None):
+        self.export_dir = Path(export_dir or EXPORT_DIR)
+        self.file_format = file_format or settings.EXPORT_FORMAT
+        if self.file_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported export format: {self.file_format}")
+
+    def files(self) -> List[Path]:
+        """Список файлов-частей в порядке выгрузки"""
+        return sorted(self.export_dir.glob(f"analyses-*.{FILE_EXTENSIONS[self.file_format]}"))
+
+    def dataset(self) -> ds.Dataset:
+        """Набор данных pyarrow поверх всех частей; файлы открываются через memory map"""
+        return ds.dataset(
+            [str(path) for path in self.files()],
+            schema=ANALYSIS_SCHEMA,
+            format=DATASET_FORMATS[self.file_format],
+            filesystem=pafs.LocalFileSystem(use_mmap=True)
+        )
+
+    def scan(
+        self,
+        columns: Optional[List[str]] = None,
+        filter: Optional[pc.Expression] = None
+    ) -> Iterator[pa.RecordBatch]:
+        """Потоковое сканирование с проекцией колонок и фильтром на уровне сканера"""
+        yield from self.dataset().scanner(columns=columns, filter=filter).to_batches()
+
+    def read(
+        self,
+        columns: Optional[List[str]] = None,
+        filter: Optional[pc.Expression] = None
+    ) -> pa.Table:
+        """Чтение всей истории (или ее проекции) в одну таблицу"""
+        return self.dataset().to_table(columns=columns, filter=filter)
@@ -0,0 +1,338 @@
+"""
+Извлечение данных о продуктах из сохраненных HTML страниц Amazon.
+
+Серверный аналог AmazonDataExtractor из extension/content.js: те же поля
+и селекторы, очистка значений через DataValidator.
+
+Запуск из директории backend:
+    python -m app.extraction /path/to/pages -o products.jsonl --workers 8
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+import argparse
+import gzip
+import logging
+import os
+import re
+import sys
+
+from lxml import etree, html
+
+from .models import ProductCreate
+from .validators import DataValidator
+
+logger = logging.getLogger(__name__)
+
+PAGE_SUFFIXES = (".html.gz", ".htm.gz", ".html", ".htm")
+
+# Перевод размеров в дюймы
+DIMENSION_UNITS = {"inches": 1.0, "in": 1.0, "cm": 1 / 2.54, "mm": 1 / 25.4}
+
+_ASIN_RE = re.compile(r"/(?:dp|gp/product)/([A-Z0-9]{10})(?:[/?]|$)")
+_BSR_CATEGORY_RE = re.compile(r"#[\d,]+\s+in\s+([^(\n]+)")
+_DIMENSIONS_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*x\s*(\d+(?:\.\d+)?)\s*x\s*(\d+(?:\.\d+)?)\s*(inches|in|cm|mm)?",
+    re.IGNORECASE
+)
+
+
+class AmazonPageExtractor:
+    """
+    Извлечение данных продукта из HTML страницы Amazon.
+    Документ обходится один раз: собирается индекс элементов по id
+    и кандидаты цены, дальше поиск идет только внутри найденных блоков.
+    """
+
+    _index = etree.XPath('//*[@id or (self::span and contains(@class, "a-offscreen"))]')
+    # Сохраненные HTTP ответы часто без <meta charset>, и lxml тогда читает их как Latin-1
+    _utf8_parser = html.HTMLParser(encoding="utf-8")
+
+    def extract(self, content: bytes, url: Optional[str] = None) -> Optional[ProductCreate]:
+        """
+        Извлечение продукта из HTML.
+        Возвращает None, если это не страница продукта или нет ASIN, названия и цены.
+        """
+        if not content.strip():
+            return None
+        doc = self._parse(content)
+        ids, offscreen_prices = self._build_index(doc)
+        if "dp" not in ids and "productTitle" not in ids:
+            return None
+
+        url = url or self.get_canonical_url(doc)
+        asin = self.get_asin(ids, url)
+        title = self.get_title(ids)
+        price = self.get_price(ids, offscreen_prices)
+        if not asin or not title or price is None:
+            return None
+
+        details = self.get_details(ids)
+        return ProductCreate(
+            asin=asin,
+            title=title,
+            price=price,
+            url=url,
+            description=self.get_description(ids),
+            features=self.get_features(ids),
+            rating=self.get_rating(ids),
+            total_reviews=self.get_reviews_count(ids),
+            bsr_rank=self.get_best_sellers_rank(details),
+            bsr_category=self.get_bsr_category(details),
+            dimensions=self.get_dimensions(details),
+            weight=self.get_weight(details)
+        )
+
+    def _parse(self, content: bytes) -> html.HtmlElement:
+        """
+        Разбор HTML: страницы в корректном UTF-8 читаются как UTF-8,
+        остальные - по объявленной в разметке кодировке.
+        """
+        try:
+            content.decode("utf-8")
+        except UnicodeDecodeError:
+            return html.fromstring(content)
+        return html.fromstring(content, parser=self._utf8_parser)
+
+    def _build_index(self, doc) -> Tuple[Dict[str, html.HtmlElement], List[html.HtmlElement]]:
+        """Индекс элементов по id и элементы .a-price .a-offscreen за один проход"""
+        ids = {}
+        offscreen_prices = []
+        for element in self._index(doc):
+            element_id = element.get("id")
+            if element_id:
+                ids.setdefault(element_id, element)
+            if element.tag == "span" and "a-offscreen" in element.classes:
+                if any("a-price" in parent.classes for parent in element.iterancestors()):
+                    offscreen_prices.append(element)
+        return ids, offscreen_prices
+
+    def get_canonical_url(self, doc) -> Optional[str]:
+        """Canonical ссылка страницы"""
+        head = doc.find("head")
+        if head is None:
+            return None
+        for link in head.iter("link"):
+            if link.get("rel") == "canonical" and (link.get("href") or "").strip():
+                return link.get("href").strip()
+        return None
+
+    def get_asin(self, ids: Dict, url: Optional[str] = None) -> Optional[str]:
+        """Получение ASIN из поля формы или URL страницы"""
+        asin_input = ids.get("ASIN")
+        if asin_input is not None and (asin_input.get("value") or "").strip():
+            return asin_input.get("value").strip()
+        if url:
+            asin_match = _ASIN_RE.search(url)
+            if asin_match:
+                return asin_match.group(1)
+        return None
+
+    def get_title(self, ids: Dict) -> Optional[str]:
+        return self._text(ids.get("productTitle"))
+
+    def get_price(self, ids: Dict, offscreen_prices: List) -> Optional[float]:
+        candidates = [ids.get("priceblock_ourprice"), ids.get("priceblock_saleprice")] + offscreen_prices
+        for element in candidates:
+            text = self._text(element)
+            if text:
+                return DataValidator.clean_price(text)
+        return None
+
+    def get_rating(self, ids: Dict) -> Optional[float]:
+        element = ids.get("acrPopover")
+        return DataValidator.clean_rating(element.get("title")) if element is not None else None
+
+    def get_reviews_count(self, ids: Dict) -> int:
+        return DataValidator.clean_reviews_count(self._text(ids.get("acrCustomerReviewText"))) or 0
+
+    def get_details(self, ids: Dict) -> List[str]:
+        """Строки блока с подробной информацией о продукте"""
+        rows = []
+        for block_id, tag in (("productDetails_detailBullets_sections1", "tr"), ("detailBullets_feature_div", "li")):
+            block = ids.get(block_id)
+            if block is not None:
+                rows.extend(" ".join(element.text_content().split()) for element in block.iter(tag))
+        return rows
+
+    def get_best_sellers_rank(self, details: List[str]) -> Optional[int]:
+        row = self._find_detail(details, "Best Sellers Rank")
+        if row is None:
+            return None
+        return DataValidator.clean_bsr(row.split("Best Sellers Rank", 1)[1])
+
+    def get_bsr_category(self, details: List[str]) -> Optional[str]:
+        row = self._find_detail(details, "Best Sellers Rank")
+        if row is None:
+            return None
+        category_match = _BSR_CATEGORY_RE.search(row)
+        return category_match.group(1).strip() if category_match else None
+
+    def get_features(self, ids: Dict) -> List[str]:
+        block = ids.get("feature-bullets")
+        if block is None:
+            return []
+        features = []
+        for element in block.iter("li"):
+            text = element.text_content().strip()
+            if text and "Secure transaction" not in text:
+                features.append(text)
+        return features
+
+    def get_description(self, ids: Dict) -> Optional[str]:
+        return self._text(ids.get("productDescription"))
+
+    def get_dimensions(self, details: List[str]) -> Optional[Dict[str, float]]:
+        """Размеры продукта в дюймах"""
+        row = (
+            self._find_detail(details, "Product Dimensions")
+            or self._find_detail(details, "Package Dimensions")
+        )
+        if row is None:
+            return None
+
+        dimensions = DataValidator.extract_dimensions(row)
+        if dimensions:
+            values = (dimensions["length"], dimensions["width"], dimensions["height"])
+            unit = dimensions["unit"]
+        else:
+            # Формат "10 x 5 x 3 inches", как в расширении
+            dimensions_match = _DIMENSIONS_RE.search(row)
+            if not dimensions_match:
+                return None
+            values = tuple(float(value) for value in dimensions_match.group(1, 2, 3))
+            unit = (dimensions_match.group(4) or "inches").lower()
+
+        factor = DIMENSION_UNITS.get(unit, 1.0)
+        length, width, height = (round(value * factor, 4) for value in values)
+        return {"length": length, "width": width, "height": height}
+
+    def get_weight(self, details: List[str]) -> Optional[float]:
+        """Вес продукта в фунтах"""
+        return DataValidator.clean_weight(self._find_detail(details, "Item Weight"))
+
+    @staticmethod
+    def _text(element) -> Optional[str]:
+        if element is None:
+            return None
+        return element.text_content().strip() or None
+
+    @staticmethod
+    def _find_detail(details: List[str], label: str) -> Optional[str]:
+        for row in details:
+            if label in row:
+                return row
+        return None
+
+
+_extractor = AmazonPageExtractor()
+
+
+def iter_page_files(directory: Path) -> Iterator[Path]:
+    """Рекурсивный обход сохраненных страниц (в том числе gzip) без построения полного списка"""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(PAGE_SUFFIXES):
+                yield Path(root) / name
+
+
+def read_page(path: Path) -> bytes:
+    """Чтение страницы с распаковкой gzip"""
+    if path.suffix == ".gz":
+        with gzip.open(path, "rb") as page:
+            return page.read()
+    return path.read_bytes()
+
+
+def extract_file(path: Path) -> Tuple[str, Optional[ProductCreate]]:
+    """Извлечение продукта из одного файла"""
+    try:
+        return str(path), _extractor.extract(read_page(path))
+    except Exception as e:
+        logger.warning("Error extracting %s: %s", path, e)
+        return str(path), None
+
+
+def extract_files(paths: List[Path]) -> List[Tuple[str, Optional[ProductCreate]]]:
+    """Извлечение пачки файлов (выполняется в процессе-воркере)"""
+    return [extract_file(path) for path in paths]
+
+
+def extract_pages(
+    paths: Iterable[Path],
+    workers: Optional[int] = None,
+    chunksize: int = 16
+) -> Iterator[Tuple[str, Optional[ProductCreate]]]:
+    """
+    Параллельное извлечение по всем ядрам.
+    Файлы отправляются воркерам пачками по chunksize, и в работе держится
+    не больше двух пачек на воркер, поэтому память ограничена окном задач
+    независимо от размера архива. Результаты отдаются в порядке входных файлов.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(extract_file, paths)
+        return
+
+    batches = _batched(paths, chunksize)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque(executor.submit(extract_files, batch) for batch in islice(batches, workers * 2))
+        while pending:
+            results = pending.popleft().result()
+            for batch in islice(batches, 1):
+                pending.append(executor.submit(extract_files, batch))
+            yield from results
+
+
+def _batched(paths: Iterable[Path], size: int) -> Iterator[List[Path]]:
+    iterator = iter(paths)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def extract_directory(
+    directory: Path,
+    workers: Optional[int] = None,
+    chunksize: int = 16
+) -> Iterator[ProductCreate]:
+    """Извлечение всех продуктов из директории с сохраненными страницами"""
+    for _, product in extract_pages(iter_page_files(directory), workers, chunksize):
+        if product is not None:
+            yield product
+
+
+def write_jsonl(products: Iterable[ProductCreate], output: TextIO) -> int:
+    """Потоковая запись продуктов в JSON Lines"""
+    count = 0
+    for product in products:
+        output.write(product.model_dump_json())
+        output.write("\n")
+        count += 1
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract products from saved Amazon pages")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("-o", "--output", type=Path, help="JSON Lines file (stdout by default)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=16)
+    args = parser.parse_args()
+
+    products = extract_directory(args.directory, args.workers, args.chunksize)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            count = write_jsonl(products, output)
+    else:
+        count = write_jsonl(products, sys.stdout)
+    print(f"Extracted {count} products", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, List, Optional, TextIO
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import time
+import traceback
+
+
+# Идентификатор текущего запроса, выставляется middleware
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Активный QueueListener; при повторной настройке предыдущий останавливается
+_listener: Optional[QueueListener] = None
+
+# Стандартные атрибуты LogRecord, которые не попадают в extra
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class RequestContextFilter(logging.Filter):
+    """Добавляет в запись идентификатор текущего запроса"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SuccessSamplingFilter(logging.Filter):
+    """
+    Сэмплирование логов успешных операций.
+    Записи, помеченные extra={"sample": True}, пропускаются с вероятностью rate;
+    предупреждения и ошибки пишутся всегда.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sample", False) or record.levelno >= logging.WARNING:
+            return True
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler, который в вызывающем потоке только фиксирует состояние записи:
+    подставляет аргументы в сообщение и копирует изменяемые значения extra.
+    Форматирование (JSON, трейсбеки) и запись выполняются в потоке QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and isinstance(value, (dict, list, set)):
+                record.__dict__[key] = copy.copy(value)
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирование записей в JSON, одна запись на строку"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in payload and key != "sample":
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = "".join(traceback.format_exception(*record.exc_info))
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Текстовый формат LOG_FORMAT с идентификатором запроса"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        return f"{message} [request_id={request_id}]" if request_id else message
+
+
+def setup_logging(settings, stream: Optional[TextIO] = None) -> QueueListener:
+    """
+    Настройка неблокирующего логирования.
+    Корневой логгер пишет только в очередь, а вывод в консоль (или stream)
+    и LOG_FILE выполняется фоновым потоком QueueListener.
+    """
+    formatter = (
+        JsonFormatter()
+        if settings.LOG_STRUCTURED
+        else TextFormatter(settings.LOG_FORMAT)
+    )
+
+    handlers: List[logging.Handler] = [logging.StreamHandler(stream)]
+    if settings.LOG_FILE:
+        handlers.append(logging.FileHandler(settings.LOG_FILE, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(SuccessSamplingFilter(settings.LOG_SUCCESS_SAMPLE_RATE))
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL)
+
+    global _listener
+    stop_logging()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+@atexit.register
+def stop_logging() -> None:
+    """Остановка фонового потока с дозаписью очереди; повторный вызов безопасен"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+class StageTimer:
+    """Замер времени этапов обработки запроса в миллисекундах"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._started_at = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - started_at) * 1000, 2)
+
+    def total(self) -> Dict[str, float]:
+        """Времена этапов вместе с общим временем"""
+        return {**self.timings, "total": round((time.perf_counter() - self._started_at) * 1000, 2)}
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
 from .models import (
     ProductCreate,
@@ -6,18 +6,23 @@ from .models import (
     AnalysisResponse,
     CompetitionAnalysis,
     ProfitAnalysis,
-    AIInsights
+    AIInsights,
+    PriceSweepRequest,
+    PriceSweepResponse
 )
-from .utils import AmazonAnalyzer, DataValidator, MarketAnalyzer
+from .utils import AmazonAnalyzer, DataValidator, MarketAnalyzer, Deadline
+from .pricing import PriceOptimizer, PriceSweepError
+from .export import AnalysisExporter
 from .config import settings
+from .logging_config import setup_logging, request_id_var, StageTimer
 from datetime import datetime
+from typing import Optional
+import asyncio
 import logging
+import uuid
 
 # Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+setup_logging(settings)
 logger = logging.getLogger(__name__)
 
 # Инициализация FastAPI приложения
@@ -36,9 +41,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """Присвоение идентификатора запросу для логов"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 # Инициализация анализаторов
 amazon_analyzer = AmazonAnalyzer()
 market_analyzer = MarketAnalyzer()
+price_optimizer = PriceOptimizer()
+analysis_exporter = AnalysisExporter() if settings.EXPORT_ENABLED else None
+
+
+export_flush_task: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def start_analysis_history_flush():
+    """Запуск периодической записи буфера истории анализов"""
+    global export_flush_task
+    if analysis_exporter:
+        export_flush_task = asyncio.create_task(
+            analysis_exporter.run_periodic_flush(settings.EXPORT_FLUSH_INTERVAL)
+        )
+
+
+@app.on_event("shutdown")
+async def flush_analysis_history():
+    """Запись оставшейся в буфере истории анализов"""
+    if export_flush_task:
+        export_flush_task.cancel()
+    if analysis_exporter:
+        await analysis_exporter.wait_pending_writes()
+        await asyncio.to_thread(analysis_exporter.flush)
 
 
 @app.get("/")
@@ -52,28 +96,50 @@ async def read_root():
 
 
 @app.post("/api/v1/analyze", response_model=AnalysisResponse)
-async def analyze_product(request: AnalysisRequest):
+async def analyze_product(
+    request: AnalysisRequest,
+    x_request_timeout_ms: Optional[int] = Header(None, alias="X-Request-Timeout-Ms")
+):
     """
-    Анализ продукта Amazon
+    Анализ продукта Amazon.
+    Бюджет времени берется из поля timeout_ms или заголовка X-Request-Timeout-Ms;
+    если AI анализ не укладывается в него или завершается ошибкой,
+    возвращаются запасные инсайты, а секция помечается в partial_sections.
     """
     try:
-        logger.info(f"Starting analysis for product: {request.product.asin}")
+        deadline = Deadline.from_budget(request.timeout_ms or x_request_timeout_ms)
+        timer = StageTimer()
+        asin = request.product.asin
+        logger.debug("Starting analysis for product: %s", asin)
 
         # Валидация данных
         product_data = request.product.dict()
 
         # Анализ конкуренции
-        competition_data = await amazon_analyzer.analyze_competition(product_data)
-        competition_analysis = CompetitionAnalysis(**competition_data)
+        with timer.stage("competition"):
+            competition_data = await amazon_analyzer.analyze_competition(product_data)
+            competition_analysis = CompetitionAnalysis(**competition_data)
 
         # Анализ прибыльности
-        profit_data = await amazon_analyzer.analyze_profit_potential(product_data)
-        profit_analysis = ProfitAnalysis(**profit_data)
+        with timer.stage("profit"):
+            profit_data = await amazon_analyzer.analyze_profit_potential(product_data)
+            profit_analysis = ProfitAnalysis(**profit_data)
 
         # AI анализ (если запрошен)
         ai_insights = None
+        partial_sections = []
         if request.include_ai_analysis:
-            ai_data = await amazon_analyzer.get_ai_insights(product_data)
+            if deadline.expired():
+                logger.warning("AI analysis deadline exceeded for product: %s", asin)
+                ai_data, is_fallback = amazon_analyzer.get_fallback_insights(), True
+            else:
+                with timer.stage("ai"):
+                    ai_data, is_fallback = await amazon_analyzer.get_ai_insights(
+                        product_data,
+                        timeout=deadline.remaining()
+                    )
+            if is_fallback:
+                partial_sections.append("ai_insights")
             ai_insights = AIInsights(**ai_data)
 
         # Формируем ответ
@@ -82,20 +148,63 @@ async def analyze_product(request: AnalysisRequest):
             competition_analysis=competition_analysis,
             profit_analysis=profit_analysis,
             ai_insights=ai_insights,
-            analysis_date=datetime.utcnow()
+            analysis_date=datetime.utcnow(),
+            partial=bool(partial_sections),
+            partial_sections=partial_sections
         )
 
-        logger.info(f"Analysis completed successfully for product: {request.product.asin}")
+        if analysis_exporter:
+            try:
+                with timer.stage("export"):
+                    analysis_exporter.record(request.product, response)
+            except Exception as e:
+                # Ошибка выгрузки не должна ломать ответ клиенту
+                logger.error("Error exporting analysis: %s", e)
+
+        logger.info(
+            "Analysis completed successfully for product: %s", asin,
+            extra={"asin": asin, "timings": timer.total(), "partial_sections": partial_sections, "sample": True}
+        )
         return response
 
     except Exception as e:
-        logger.error(f"Error analyzing product: {str(e)}")
+        logger.exception("Error analyzing product: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error analyzing product: {str(e)}"
         )
 
 
+@app.post("/api/v1/pricing/sweep", response_model=PriceSweepResponse)
+async def sweep_prices(request: PriceSweepRequest):
+    """
+    Расчет маржи, продаж и выручки на ценовой сетке
+    и поиск цены, максимизирующей выручку
+    """
+    def run_sweep() -> PriceSweepResponse:
+        curves = price_optimizer.sweep(
+            [item.dict() for item in request.items],
+            points=request.points,
+            price_min=request.price_min,
+            price_max=request.price_max,
+            include_curve=request.include_curve
+        )
+        return PriceSweepResponse(curves=curves)
+
+    try:
+        # Расчет на numpy и сборка ответа не должны блокировать event loop
+        return await asyncio.to_thread(run_sweep)
+
+    except PriceSweepError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error sweeping prices: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error sweeping prices: {str(e)}"
+        )
+
+
 @app.get("/api/v1/health")
 async def health_check():
     """
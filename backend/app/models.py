@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict
 from datetime import datetime
+import math
 
 class ProductBase(BaseModel):
     asin: str = Field(..., description="Amazon Standard Identification Number")
@@ -31,6 +32,7 @@ class Config:
 class AnalysisRequest(BaseModel):
     product: ProductCreate
     include_ai_analysis: bool = Field(default=True, description="Whether to include AI analysis")
+    timeout_ms: Optional[int] = Field(None, gt=0, description="Client time budget for the analysis in milliseconds")
 
 class CompetitionAnalysis(BaseModel):
     score: float = Field(..., ge=0, le=1, description="Competition score")
@@ -44,6 +46,66 @@ class ProfitAnalysis(BaseModel):
     estimated_monthly_sales: int = Field(..., description="Estimated monthly sales")
     estimated_monthly_revenue: float = Field(..., description="Estimated monthly revenue")
 
+class PriceSweepItem(BaseModel):
+    product: ProductCreate
+    unit_cost: Optional[float] = Field(None, ge=0, allow_inf_nan=False, description="Landed unit cost; defaults to a share of the current price")
+
+    @field_validator("product")
+    @classmethod
+    def check_price(cls, product: ProductCreate) -> ProductCreate:
+        from .config import settings
+        if not math.isfinite(product.price) or product.price <= 0:
+            raise ValueError("product price must be a positive number")
+        if product.price > settings.PRICE_SWEEP_MAX_PRICE:
+            raise ValueError(f"product price must not exceed {settings.PRICE_SWEEP_MAX_PRICE}")
+        return product
+
+class PriceSweepRequest(BaseModel):
+    items: List[PriceSweepItem] = Field(..., min_length=1, description="Products to evaluate")
+    points: int = Field(default=1000, ge=2, description="Number of price points in the grid")
+    price_min: Optional[float] = Field(None, gt=0, allow_inf_nan=False, description="Lower bound of the grid; defaults to 50% of the current price")
+    price_max: Optional[float] = Field(None, gt=0, allow_inf_nan=False, description="Upper bound of the grid; defaults to 200% of the current price")
+    include_curve: bool = Field(default=True, description="Whether to return the full price curve")
+
+    # Настройки читаются при валидации, чтобы модели импортировались без app.config
+    @field_validator("items")
+    @classmethod
+    def check_items_limit(cls, items: List[PriceSweepItem]) -> List[PriceSweepItem]:
+        from .config import settings
+        if len(items) > settings.PRICE_SWEEP_MAX_ITEMS:
+            raise ValueError(f"at most {settings.PRICE_SWEEP_MAX_ITEMS} items are allowed")
+        return items
+
+    @field_validator("price_min", "price_max")
+    @classmethod
+    def check_price_bound(cls, value: Optional[float]) -> Optional[float]:
+        from .config import settings
+        if value is not None and value > settings.PRICE_SWEEP_MAX_PRICE:
+            raise ValueError(f"price bounds must not exceed {settings.PRICE_SWEEP_MAX_PRICE}")
+        return value
+
+    @field_validator("points")
+    @classmethod
+    def check_points_limit(cls, points: int) -> int:
+        from .config import settings
+        if points > settings.PRICE_SWEEP_MAX_POINTS:
+            raise ValueError(f"points must not exceed {settings.PRICE_SWEEP_MAX_POINTS}")
+        return points
+
+class PriceCurve(BaseModel):
+    asin: str
+    optimal_price: float = Field(..., description="Revenue-maximizing price")
+    max_monthly_revenue: float = Field(..., description="Estimated monthly revenue at the optimal price")
+    sales_at_optimal: float = Field(..., description="Estimated monthly sales at the optimal price")
+    margin_at_optimal: float = Field(..., description="Profit margin at the optimal price")
+    prices: List[float] = Field(default_factory=list, description="Price grid")
+    margins: List[float] = Field(default_factory=list, description="Profit margin for each price")
+    monthly_sales: List[float] = Field(default_factory=list, description="Estimated monthly sales for each price")
+    monthly_revenues: List[float] = Field(default_factory=list, description="Estimated monthly revenue for each price")
+
+class PriceSweepResponse(BaseModel):
+    curves: List[PriceCurve]
+
 class AIInsights(BaseModel):
     summary: str = Field(..., description="AI generated summary")
     opportunities: List[str] = Field(..., description="List of opportunities")
@@ -56,6 +118,8 @@ class AnalysisResponse(BaseModel):
     profit_analysis: ProfitAnalysis
     ai_insights: Optional[AIInsights]
     analysis_date: datetime = Field(default_factory=datetime.utcnow)
+    partial: bool = Field(default=False, description="Whether some sections were not fully computed within the deadline")
+    partial_sections: List[str] = Field(default_factory=list, description="Sections replaced with fallback data")
 
     class Config:
         schema_extra = {
@@ -87,6 +151,8 @@ class AnalysisResponse(BaseModel):
                         "Focus on product differentiation",
                         "Optimize pricing strategy"
                     ]
-                }
+                },
+                "partial": False,
+                "partial_sections": []
             }
         }
\ No newline at end of file
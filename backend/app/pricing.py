@@ -0,0 +1,263 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import math
+import threading
+import time
+
+import numpy as np
+
+from .config import settings
+from .utils import MarketAnalyzer
+
+# Поточечные данные кривой и точность округления в ответе
+CURVE_DECIMALS = {"prices": 2, "margins": 4, "monthly_sales": 2, "monthly_revenues": 2}
+
+
+class PriceSweepError(ValueError):
+    """Некорректные параметры ценового анализа"""
+
+
+class PriceSweepCache:
+    """LRU кэш рассчитанных ценовых кривых с ограничением по времени жизни"""
+
+    def __init__(self, max_size: int, expire_time: int):
+        self.max_size = max_size
+        self.expire_time = expire_time
+        self._items: "OrderedDict[Tuple, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[Dict]:
+        """Получение кривой из кэша"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            created_at, value = item
+            if time.monotonic() - created_at > self.expire_time:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple, value: Dict) -> None:
+        """Сохранение кривой в кэш"""
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class PriceOptimizer:
+    """
+    Векторизованный анализ цены: маржа, продажи и выручка на ценовой сетке.
+
+    Спрос моделируется логистической кривой вокруг цены, которую готов
+    платить покупатель: текущая цена с поправкой на рейтинг, отзывы и BSR.
+    Ширина кривой (чувствительность к цене) задается относительным разбросом
+    ценовых диапазонов категории (MarketAnalyzer.PRICE_RANGES).
+    Спрос нормируется так, чтобы при текущей цене продажи совпадали
+    с оценкой MarketAnalyzer.calculate_market_size.
+    """
+
+    DEFAULT_BSR = 100000
+    DEFAULT_MIN_MULTIPLIER = 0.5
+    DEFAULT_MAX_MULTIPLIER = 2.0
+    # Доля относительного разброса цен категории, задающая ширину кривой спроса
+    DEMAND_WIDTH_FACTOR = 0.5
+
+    def __init__(self, cache: Optional[PriceSweepCache] = None):
+        self.cache = cache or PriceSweepCache(
+            settings.PRICE_SWEEP_CACHE_SIZE,
+            settings.CACHE_EXPIRE_TIME
+        )
+
+    def sweep(
+        self,
+        items: List[Dict],
+        points: int = 1000,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        include_curve: bool = True
+    ) -> List[Dict]:
+        """
+        Расчет ценовых кривых для списка продуктов.
+        items - словари с ключами product (данные продукта) и unit_cost.
+        Продукты, отсутствующие в кэше, считаются одним матричным проходом.
+        """
+        if points > settings.PRICE_SWEEP_MAX_POINTS:
+            raise PriceSweepError(f"points must not exceed {settings.PRICE_SWEEP_MAX_POINTS}")
+        if len(items) * points > settings.PRICE_SWEEP_MAX_CELLS:
+            raise PriceSweepError(f"items x points must not exceed {settings.PRICE_SWEEP_MAX_CELLS}")
+        if price_min is not None and price_max is not None and price_min >= price_max:
+            raise PriceSweepError("price_min must be less than price_max")
+
+        keys = [self._cache_key(item, points, price_min, price_max) for item in items]
+        curves: List[Optional[Dict]] = [self.cache.get(key) for key in keys]
+
+        missing = [i for i, curve in enumerate(curves) if curve is None]
+        if missing:
+            computed = self._compute([items[i] for i in missing], points, price_min, price_max)
+            for i, curve in zip(missing, computed):
+                self.cache.set(keys[i], curve)
+                curves[i] = curve
+
+        return [self._to_response(curve, include_curve) for curve in curves]
+
+    def _compute(
+        self,
+        items: List[Dict],
+        points: int,
+        price_min: Optional[float],
+        price_max: Optional[float]
+    ) -> List[Dict]:
+        """Расчет кривых для всех продуктов в виде матриц (продукты x точки)"""
+        n = len(items)
+        current_price = np.empty(n)
+        unit_cost = np.empty(n)
+        base_sales = np.empty(n)
+        reference_price = np.empty(n)
+        scale = np.empty(n)
+
+        for i, item in enumerate(items):
+            product = item["product"]
+            category = product.get("bsr_category") or "default"
+            price = max(float(product.get("price") or 0), 0.01)
+            ranges = MarketAnalyzer.PRICE_RANGES.get(category, MarketAnalyzer.PRICE_RANGES["default"])
+            market = MarketAnalyzer.calculate_market_size(
+                product.get("bsr_rank") or self.DEFAULT_BSR,
+                category
+            )
+
+            current_price[i] = price
+            cost = item.get("unit_cost")
+            unit_cost[i] = cost if cost is not None else price * settings.PRICE_SWEEP_DEFAULT_COST_RATIO
+            base_sales[i] = market["monthly_sales"]
+            reference_price[i] = price * self._pricing_power(product, ranges)
+            spread = (ranges["high"] - ranges["low"]) / (ranges["high"] + ranges["low"])
+            scale[i] = reference_price[i] * spread * self.DEMAND_WIDTH_FACTOR
+
+        prices = self._price_grid(current_price, points, price_min, price_max)
+
+        ref = reference_price[:, None]
+        s = scale[:, None]
+        demand = self._logistic((ref - prices) / s)
+        demand_at_current = self._logistic((ref - current_price[:, None]) / s)
+        sales = base_sales[:, None] * demand / demand_at_current
+        revenues = prices * sales
+        margins = (prices * (1 - settings.AMAZON_REFERRAL_FEE) - unit_cost[:, None]) / prices
+
+        best = np.argmax(revenues, axis=1)
+
+        return [
+            {
+                "asin": item["product"]["asin"],
+                "optimal_price": round(float(prices[i, best[i]]), 2),
+                "max_monthly_revenue": round(float(revenues[i, best[i]]), 2),
+                "sales_at_optimal": round(float(sales[i, best[i]]), 2),
+                "margin_at_optimal": round(float(margins[i, best[i]]), 4),
+                # Строки матриц хранятся в кэше как массивы numpy
+                "prices": prices[i].copy(),
+                "margins": margins[i].copy(),
+                "monthly_sales": sales[i].copy(),
+                "monthly_revenues": revenues[i].copy()
+            }
+            for i, item in enumerate(items)
+        ]
+
+    @staticmethod
+    def _pricing_power(product: Dict, ranges: Dict) -> float:
+        """
+        Во сколько раз цена, которую готов платить покупатель, отличается от текущей.
+        Высокий рейтинг, много отзывов и сильный BSR позволяют держать цену выше;
+        положение цены в диапазонах категории сдвигает ее так же,
+        как рекомендует MarketAnalyzer.analyze_price_point.
+        """
+        rating = product.get("rating")
+        rating_factor = min(max(1 + 0.15 * (rating - 4), 0.8), 1.15) if rating else 1.0
+        reviews = product.get("total_reviews") or 0
+        review_factor = 1 + min(0.05 * math.log10(1 + reviews), 0.2)
+        bsr = product.get("bsr_rank")
+        bsr_factor = 1 + 0.1 * (1 - min(1, bsr / 100000)) if bsr else 1.0
+        price = product.get("price") or 0
+        if price <= ranges["low"]:
+            position_factor = 1.05
+        elif price > ranges["high"]:
+            position_factor = 0.95
+        else:
+            position_factor = 1.0
+        return rating_factor * review_factor * bsr_factor * position_factor
+
+    def _price_grid(
+        self,
+        current_price: np.ndarray,
+        points: int,
+        price_min: Optional[float],
+        price_max: Optional[float]
+    ) -> np.ndarray:
+        """
+        Построение ценовой сетки (продукты x точки).
+        Если задана только одна граница, а граница по умолчанию оказывается
+        по другую сторону от нее, вторая граница выводится из заданной
+        с тем же соотношением DEFAULT_MAX_MULTIPLIER / DEFAULT_MIN_MULTIPLIER.
+        """
+        steps = np.linspace(0.0, 1.0, points)
+        ratio = self.DEFAULT_MAX_MULTIPLIER / self.DEFAULT_MIN_MULTIPLIER
+        default_low = current_price * self.DEFAULT_MIN_MULTIPLIER
+        default_high = current_price * self.DEFAULT_MAX_MULTIPLIER
+
+        if price_min is not None and price_max is not None:
+            low = np.full_like(current_price, price_min)
+            high = np.full_like(current_price, price_max)
+        elif price_min is not None:
+            low = np.full_like(current_price, price_min)
+            high = np.where(default_high > price_min, default_high, price_min * ratio)
+        elif price_max is not None:
+            high = np.full_like(current_price, price_max)
+            low = np.where(default_low < price_max, default_low, price_max / ratio)
+        else:
+            low, high = default_low, default_high
+        return low[:, None] + (high - low)[:, None] * steps[None, :]
+
+    @staticmethod
+    def _logistic(x: np.ndarray) -> np.ndarray:
+        """Численно устойчивая логистическая функция"""
+        return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+    @staticmethod
+    def _cache_key(
+        item: Dict,
+        points: int,
+        price_min: Optional[float],
+        price_max: Optional[float]
+    ) -> Tuple:
+        """Ключ кэша: продукт, категория и параметры сетки"""
+        product = item["product"]
+        return (
+            product["asin"],
+            product.get("bsr_category"),
+            product.get("bsr_rank"),
+            product.get("rating"),
+            product.get("total_reviews"),
+            product.get("price"),
+            item.get("unit_cost"),
+            points,
+            price_min,
+            price_max
+        )
+
+    @staticmethod
+    def _to_response(curve: Dict, include_curve: bool) -> Dict:
+        """Преобразование кривой в ответ; поточечные данные переводятся в списки только по запросу"""
+        response = {
+            key: value for key, value in curve.items()
+            if key not in CURVE_DECIMALS
+        }
+        if include_curve:
+            for key, decimals in CURVE_DECIMALS.items():
+                response[key] = np.round(curve[key], decimals).tolist()
+        return response
@@ -1,16 +1,46 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import openai
 from .config import settings
+from .validators import DataValidator
 import aiohttp
+import asyncio
 import json
-import re
+import logging
+import time
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+
+class Deadline:
+    """Бюджет времени на обработку запроса"""
+
+    def __init__(self, timeout_ms: int, reserve_ms: int = 0):
+        self.timeout_ms = timeout_ms
+        self.reserve_ms = reserve_ms
+        self._expires_at = time.monotonic() + timeout_ms / 1000
+
+    @classmethod
+    def from_budget(cls, budget_ms: Optional[int]) -> "Deadline":
+        """Создание дедлайна из бюджета клиента с учетом ограничений"""
+        if not budget_ms or budget_ms <= 0:
+            budget_ms = settings.ANALYSIS_DEFAULT_TIMEOUT_MS
+        budget_ms = min(budget_ms, settings.ANALYSIS_MAX_TIMEOUT_MS)
+        return cls(budget_ms, settings.ANALYSIS_DEADLINE_RESERVE_MS)
+
+    def remaining(self) -> float:
+        """Оставшееся время в секундах за вычетом запаса на ответ"""
+        left = self._expires_at - time.monotonic() - self.reserve_ms / 1000
+        return max(left, 0.0)
+
+    def expired(self) -> bool:
+        """Истек ли бюджет"""
+        return self.remaining() <= 0
+
 
 class AmazonAnalyzer:
     def __init__(self):
-        self.openai = openai
-        self.openai.api_key = settings.OPENAI_API_KEY
+        self.openai = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 
     async def analyze_competition(self, product_data: Dict) -> Dict:
         """Анализ конкуренции на основе данных о продукте"""
@@ -34,37 +64,47 @@ class AmazonAnalyzer:
             "potential_profit_margin": margin,
             "recommended_price": recommended_price,
             "estimated_monthly_sales": monthly_sales,
-            "estimated_monthly_revenue": monthly_sales * recommended_price
+            "estimated_monthly_revenue": round(monthly_sales * recommended_price, 2)
         }
 
-    async def get_ai_insights(self, product_data: Dict) -> Dict:
-        """Получение аналитических выводов от AI"""
+    async def get_ai_insights(self, product_data: Dict, timeout: Optional[float] = None) -> Tuple[Dict, bool]:
+        """
+        Получение аналитических выводов от AI.
+        Запрос к OpenAI ограничивается timeout (в секундах), если он задан.
+        Возвращает инсайты и признак того, что вместо ответа AI
+        использованы запасные инсайты (ошибка или истекший бюджет).
+        """
         try:
             prompt = self._create_analysis_prompt(product_data)
-            response = await self.openai.ChatCompletion.create(
-                model=settings.OPENAI_MODEL,
+            completion = self.openai.chat.completions.create(
                 messages=[
                     {"role": "system", "content": """
                     Ты эксперт по анализу Amazon продуктов и рынка. 
                     Проанализируй данные и предоставь структурированные рекомендации.
                     Фокусируйся на конкретных, действенных советах."""},
                     {"role": "user", "content": prompt}
-                ]
+                ],
+                timeout=timeout,
+                **settings.get_openai_args()
             )
+            response = await asyncio.wait_for(completion, timeout)
 
             insights = self._parse_ai_response(response.choices[0].message.content)
-            return insights
+            return insights, False
+        except asyncio.TimeoutError:
+            logger.warning("AI insights deadline exceeded")
+            return self.get_fallback_insights(), True
         except Exception as e:
-            print(f"Error getting AI insights: {str(e)}")
-            return self._get_fallback_insights()
+            logger.error("Error getting AI insights: %s", e)
+            return self.get_fallback_insights(), True
 
     def _calculate_competition_score(self, data: Dict) -> float:
         """Расчет оценки конкуренции"""
         base_score = 0.5
         factors = {
-            'reviews': self._normalize_review_count(data.get('total_reviews', 0)),
-            'rating': self._normalize_rating(data.get('rating', 0)),
-            'bsr': self._normalize_bsr(data.get('bsr_rank', 0))
+            'reviews': self._normalize_review_count(data.get('total_reviews') or 0),
+            'rating': self._normalize_rating(data.get('rating') or 0),
+            'bsr': self._normalize_bsr(data.get('bsr_rank') or 0)
         }
 
         weighted_score = (
@@ -75,6 +115,39 @@ class AmazonAnalyzer:
 
         return round(min(max(weighted_score, 0), 1), 2)
 
+    def _calculate_recommended_price(self, data: Dict) -> float:
+        """Рекомендуемая цена с учетом ценовых диапазонов категории"""
+        price = data.get('price') or 0
+        category = data.get('bsr_category') or 'default'
+        ranges = MarketAnalyzer.PRICE_RANGES.get(category, MarketAnalyzer.PRICE_RANGES['default'])
+        position = MarketAnalyzer.analyze_price_point(price, category)['price_position']
+
+        if position == 'low':
+            recommended = min(price * 1.1, ranges['medium'])
+        elif position == 'premium':
+            recommended = max(price * 0.9, ranges['high'])
+        else:
+            recommended = price
+        return round(max(recommended, price * 0.5), 2)
+
+    def _calculate_potential_margin(self, data: Dict) -> float:
+        """Маржа при рекомендуемой цене за вычетом комиссии Amazon и оценки себестоимости"""
+        price = data.get('price') or 0
+        recommended_price = self._calculate_recommended_price(data)
+        if recommended_price <= 0:
+            return 0.0
+        unit_cost = price * settings.PRICE_SWEEP_DEFAULT_COST_RATIO
+        margin = (recommended_price * (1 - settings.AMAZON_REFERRAL_FEE) - unit_cost) / recommended_price
+        return round(margin, 4)
+
+    def _estimate_monthly_sales(self, data: Dict) -> int:
+        """Оценка продаж в месяц по BSR и категории"""
+        market = MarketAnalyzer.calculate_market_size(
+            data.get('bsr_rank') or 100000,
+            data.get('bsr_category') or 'default'
+        )
+        return int(market['monthly_sales'])
+
     def _normalize_review_count(self, reviews: int) -> float:
         """Нормализация количества отзывов"""
         if reviews == 0:
@@ -143,7 +216,7 @@ class AmazonAnalyzer:
             return "Информация о характеристиках отсутствует"
         return "\n".join(f"- {feature}" for feature in features)
 
-    def _get_fallback_insights(self) -> Dict:
+    def get_fallback_insights(self) -> Dict:
         """Запасные инсайты в случае ошибки AI"""
         return {
             "summary": "Базовый анализ продукта на основе доступных данных.",
@@ -196,101 +269,33 @@ class AmazonAnalyzer:
         return sections
 
 
-class DataValidator:
-    """Класс для валидации и очистки данных"""
-
-    @staticmethod
-    def clean_price(price_str: str) -> Optional[float]:
-        """Очистка и валидация цены"""
-        if not price_str:
-            return None
-        try:
-            # Удаляем все символы кроме цифр и точки
-            clean_price = re.sub(r'[^\d.]', '', price_str)
-            return float(clean_price)
-        except ValueError:
-            return None
-
-    @staticmethod
-    def clean_rating(rating_str: str) -> Optional[float]:
-        """Очистка и валидация рейтинга"""
-        if not rating_str:
-            return None
-        try:
-            # Извлекаем число из строки (например, "4.5 out of 5")
-            rating_match = re.search(r'(\d+\.?\d*)', rating_str)
-            if rating_match:
-                rating = float(rating_match.group(1))
-                # Продолжение класса DataValidator в utils.py
-                if 0 <= rating <= 5:
-                    return rating
-            return None
-        except ValueError:
-            return None
-
-    @staticmethod
-    def clean_reviews_count(reviews_str: str) -> Optional[int]:
-        """Очистка и валидация количества отзывов"""
-        if not reviews_str:
-            return None
-        try:
-            # Удаляем запятые и извлекаем число
-            clean_count = re.sub(r'[^\d]', '', reviews_str)
-            return int(clean_count) if clean_count else None
-        except ValueError:
-            return None
-
-    @staticmethod
-    def clean_bsr(bsr_str: str) -> Optional[int]:
-        """Очистка и валидация BSR (Best Sellers Rank)"""
-        if not bsr_str:
-            return None
-        try:
-            # Извлекаем первое число из строки BSR
-            bsr_match = re.search(r'#?([\d,]+)', bsr_str)
-            if bsr_match:
-                bsr = int(bsr_match.group(1).replace(',', ''))
-                return bsr
-            return None
-        except ValueError:
-            return None
-
-    @staticmethod
-    def extract_dimensions(dimension_str: str) -> Optional[Dict[str, float]]:
-        """Извлечение размеров продукта"""
-        if not dimension_str:
-            return None
-        try:
-            # Ищем числа с единицами измерения
-            dims = re.findall(r'([\d.]+)\s*(inches|in|cm|mm)', dimension_str.lower())
-            if len(dims) >= 3:
-                return {
-                    'length': float(dims[0][0]),
-                    'width': float(dims[1][0]),
-                    'height': float(dims[2][0]),
-                    'unit': dims[0][1]
-                }
-            return None
-        except ValueError:
-            return None
-
-
 class MarketAnalyzer:
     """Класс для анализа рыночных данных"""
 
+    # Базовые коэффициенты для разных категорий
+    CATEGORY_COEFFICIENTS = {
+        'Electronics': 0.8,
+        'Home & Kitchen': 0.7,
+        'Sports & Outdoors': 0.6,
+        'Beauty & Personal Care': 0.75,
+        'Toys & Games': 0.65,
+        'default': 0.5
+    }
+
+    # Оптимальные ценовые диапазоны по категориям
+    PRICE_RANGES = {
+        'Electronics': {'low': 20, 'medium': 50, 'high': 100},
+        'Home & Kitchen': {'low': 15, 'medium': 35, 'high': 70},
+        'Sports & Outdoors': {'low': 15, 'medium': 40, 'high': 80},
+        'Beauty & Personal Care': {'low': 10, 'medium': 25, 'high': 50},
+        'Toys & Games': {'low': 10, 'medium': 30, 'high': 60},
+        'default': {'low': 15, 'medium': 35, 'high': 70}
+    }
+
     @staticmethod
     def calculate_market_size(bsr: int, category: str) -> Dict[str, any]:
         """Расчет размера рынка на основе BSR и категории"""
-        # Базовые коэффициенты для разных категорий
-        category_coefficients = {
-            'Electronics': 0.8,
-            'Home & Kitchen': 0.7,
-            'Sports & Outdoors': 0.6,
-            'Beauty & Personal Care': 0.75,
-            'Toys & Games': 0.65,
-            'default': 0.5
-        }
-
+        category_coefficients = MarketAnalyzer.CATEGORY_COEFFICIENTS
         coef = category_coefficients.get(category, category_coefficients['default'])
 
         # Расчет примерного объема продаж
@@ -314,16 +319,7 @@ class MarketAnalyzer:
     @staticmethod
     def analyze_price_point(price: float, category: str) -> Dict[str, any]:
         """Анализ ценовой точки"""
-        # Оптимальные ценовые диапазоны по категориям
-        price_ranges = {
-            'Electronics': {'low': 20, 'medium': 50, 'high': 100},
-            'Home & Kitchen': {'low': 15, 'medium': 35, 'high': 70},
-            'Sports & Outdoors': {'low': 15, 'medium': 40, 'high': 80},
-            'Beauty & Personal Care': {'low': 10, 'medium': 25, 'high': 50},
-            'Toys & Games': {'low': 10, 'medium': 30, 'high': 60},
-            'default': {'low': 15, 'medium': 35, 'high': 70}
-        }
-
+        price_ranges = MarketAnalyzer.PRICE_RANGES
         ranges = price_ranges.get(category, price_ranges['default'])
 
         if price <= ranges['low']:
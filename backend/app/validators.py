@@ -0,0 +1,98 @@
+from typing import Dict, Optional
+import re
+
+
+class DataValidator:
+    """Класс для валидации и очистки данных"""
+
+    @staticmethod
+    def clean_price(price_str: str) -> Optional[float]:
+        """Очистка и валидация цены"""
+        if not price_str:
+            return None
+        try:
+            # Удаляем все символы кроме цифр и точки
+            clean_price = re.sub(r'[^\d.]', '', price_str)
+            return float(clean_price)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def clean_rating(rating_str: str) -> Optional[float]:
+        """Очистка и валидация рейтинга"""
+        if not rating_str:
+            return None
+        try:
+            # Извлекаем число из строки (например, "4.5 out of 5")
+            rating_match = re.search(r'(\d+\.?\d*)', rating_str)
+            if rating_match:
+                rating = float(rating_match.group(1))
+                # Продолжение класса DataValidator в utils.py
+                if 0 <= rating <= 5:
+                    return rating
+            return None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def clean_reviews_count(reviews_str: str) -> Optional[int]:
+        """Очистка и валидация количества отзывов"""
+        if not reviews_str:
+            return None
+        try:
+            # Удаляем запятые и извлекаем число
+            clean_count = re.sub(r'[^\d]', '', reviews_str)
+            return int(clean_count) if clean_count else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def clean_bsr(bsr_str: str) -> Optional[int]:
+        """Очистка и валидация BSR (Best Sellers Rank)"""
+        if not bsr_str:
+            return None
+        try:
+            # Извлекаем первое число из строки BSR
+            bsr_match = re.search(r'#?([\d,]+)', bsr_str)
+            if bsr_match:
+                bsr = int(bsr_match.group(1).replace(',', ''))
+                return bsr
+            return None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def extract_dimensions(dimension_str: str) -> Optional[Dict[str, float]]:
+        """Извлечение размеров продукта"""
+        if not dimension_str:
+            return None
+        try:
+            # Ищем числа с единицами измерения
+            dims = re.findall(r'([\d.]+)\s*(inches|in|cm|mm)', dimension_str.lower())
+            if len(dims) >= 3:
+                return {
+                    'length': float(dims[0][0]),
+                    'width': float(dims[1][0]),
+                    'height': float(dims[2][0]),
+                    'unit': dims[0][1]
+                }
+            return None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def clean_weight(weight_str: str) -> Optional[float]:
+        """Извлечение веса продукта в фунтах"""
+        if not weight_str:
+            return None
+        try:
+            weight_match = re.search(r'(\d+(?:\.\d+)?)\s*(ounces|pounds|oz|lbs)', weight_str, re.IGNORECASE)
+            if weight_match:
+                weight = float(weight_match.group(1))
+                # Конвертируем все в фунты
+                if weight_match.group(2).lower() in ('ounces', 'oz'):
+                    weight /= 16
+                return round(weight, 4)
+            return None
+        except ValueError:
+            return None
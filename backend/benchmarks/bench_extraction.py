@@ -0,0 +1,85 @@
+"""
+Скорость извлечения продуктов из сохраненных страниц (страниц в секунду).
+
+Запуск из директории backend:
+    python -m benchmarks.bench_extraction --pages 2000 --workers 1 4 8
+
+Генерирует gzip страницы со структурой, которую разбирает
+AmazonDataExtractor, и прогоняет app.extraction.extract_directory
+с разным числом процессов.
+"""
+from pathlib import Path
+import argparse
+import gzip
+import os
+import tempfile
+import time
+
+from app.extraction import extract_directory
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>Amazon.com</title>
+<link rel="canonical" href="https://www.amazon.com/dp/{asin}"></head>
+<body><div id="dp">
+<input type="hidden" id="ASIN" value="{asin}">
+<span id="productTitle">  Stainless Steel Water Bottle {index}  </span>
+<span class="a-price"><span class="a-offscreen">${price}</span></span>
+<span id="acrPopover" title="4.{rating} out of 5 stars"></span>
+<span id="acrCustomerReviewText">{reviews} ratings</span>
+<div id="feature-bullets"><ul>
+<li>Keeps drinks cold for 24 hours</li>
+<li>Leak-proof lid</li>
+<li>Secure transaction</li>
+</ul></div>
+<div id="productDescription"><p>Double-wall insulated bottle.</p></div>
+<table id="productDetails_detailBullets_sections1">
+<tr><th>Product Dimensions</th><td>3 x 3 x 10.5 inches</td></tr>
+<tr><th>Item Weight</th><td>12 ounces</td></tr>
+<tr><th>Best Sellers Rank</th><td>#{bsr} in Sports &amp; Outdoors (See Top 100)</td></tr>
+</table>
+{filler}
+</div></body></html>
+"""
+
+# Объем разметки, сопоставимый с реальной страницей продукта
+FILLER = "<div class='a-section'><span>recommendation</span></div>" * 2000
+
+
+def generate_pages(directory: Path, count: int) -> int:
+    size = 0
+    for index in range(count):
+        page = PAGE_TEMPLATE.format(
+            asin=f"B{index:09d}",
+            index=index,
+            price=f"{19 + index % 50}.99",
+            rating=index % 10,
+            reviews=f"{index * 7:,}",
+            bsr=f"{index * 13 + 1:,}",
+            filler=FILLER
+        ).encode("utf-8")
+        size += len(page)
+        with gzip.open(directory / f"{index:07d}.html.gz", "wb") as output:
+            output.write(page)
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        directory = Path(tmp_dir)
+        size = generate_pages(directory, args.pages)
+        print(f"pages={args.pages} avg_page_size={size / args.pages / 1024:.0f}KiB")
+
+        for workers in args.workers:
+            started_at = time.perf_counter()
+            count = sum(1 for _ in extract_directory(directory, workers=workers))
+            elapsed = time.perf_counter() - started_at
+            print(f"workers={workers:<3} products={count} pages/s={args.pages / elapsed:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Сравнение задержек запросов при синхронном и очередном логировании.
+
+Запуск из директории backend:
+    python -m benchmarks.bench_logging --requests 20000 --concurrency 100
+
+Каждый "запрос" - корутина, которая пишет те же записи, что и analyze_product:
+DEBUG о начале анализа (отбрасывается на уровне INFO) и INFO о завершении
+с временами этапов. Обе настройки получают одинаковые записи: базовая повторяет
+прежнюю (logging.basicConfig с записью из event loop), новая - app.logging_config.setup_logging
+с QueueListener. Сценарий "slow" имитирует медленный приемник логов
+(переполненный pipe stdout, сетевой диск): каждая запись в поток блокируется.
+"""
+from types import SimpleNamespace
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from app.logging_config import setup_logging, stop_logging, request_id_var, StageTimer
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class SlowStream:
+    """Поток, каждая запись в который блокируется на delay секунд"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, data: str) -> int:
+        time.sleep(self.delay)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+def setup_sync_logging(log_file: str, stream) -> None:
+    """Прежняя синхронная настройка логирования"""
+    stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[logging.StreamHandler(stream), logging.FileHandler(log_file)]
+    )
+
+
+async def handle_request(logger: logging.Logger, asin: str) -> None:
+    request_id_var.set(asin)
+    timer = StageTimer()
+    logger.debug("Starting analysis for product: %s", asin)
+    with timer.stage("competition"):
+        await asyncio.sleep(0)
+    logger.info(
+        "Analysis completed successfully for product: %s", asin,
+        extra={"asin": asin, "timings": timer.total(), "sample": True}
+    )
+
+
+async def run(total: int, concurrency: int) -> list:
+    logger = logging.getLogger("benchmark")
+    latencies = []
+    per_worker = total // concurrency
+
+    async def worker(worker_id: int):
+        for i in range(per_worker):
+            asin = f"B{worker_id:04d}{i:05d}"
+            started_at = time.perf_counter()
+            await handle_request(logger, asin)
+            latencies.append(time.perf_counter() - started_at)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies
+
+
+def report(name: str, latencies: list, elapsed: float) -> None:
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<14} requests={len(latencies)} "
+        f"p50={quantiles[49] * 1e6:.1f}us "
+        f"p99={quantiles[98] * 1e6:.1f}us "
+        f"max={latencies[-1] * 1e6:.1f}us "
+        f"throughput={len(latencies) / elapsed:.0f} req/s"
+    )
+
+
+def measure(name: str, requests: int, concurrency: int) -> None:
+    started_at = time.perf_counter()
+    latencies = asyncio.run(run(requests, concurrency))
+    report(name, latencies, time.perf_counter() - started_at)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--sample-rate", type=float, default=1.0)
+    parser.add_argument("--slow-sink-ms", type=float, default=0.2, help="Write delay of the slow sink")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, "w") as devnull:
+        sinks = [("fast", devnull), ("slow", SlowStream(args.slow_sink_ms / 1000))]
+        for sink_name, stream in sinks:
+            setup_sync_logging(os.path.join(tmp_dir, f"sync-{sink_name}.log"), stream)
+            measure(f"sync/{sink_name}", args.requests, args.concurrency)
+
+            settings = SimpleNamespace(
+                LOG_LEVEL="INFO",
+                LOG_FORMAT=LOG_FORMAT,
+                LOG_FILE=os.path.join(tmp_dir, f"queued-{sink_name}.log"),
+                LOG_STRUCTURED=True,
+                LOG_SUCCESS_SAMPLE_RATE=args.sample_rate
+            )
+            setup_logging(settings, stream=stream)
+            measure(f"queued/{sink_name}", args.requests, args.concurrency)
+            # Дозапись очереди не входит в замер задержек запросов
+            stop_logging()
+
+
+if __name__ == "__main__":
+    main()
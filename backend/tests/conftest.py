@@ -0,0 +1,8 @@
+import os
+
+# Настройки без значений по умолчанию, нужные для импорта app.config
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Тесты API не пишут историю анализов и лог-файл в рабочую директорию
+os.environ.setdefault("EXPORT_ENABLED", "false")
+os.environ.setdefault("LOG_FILE", "")
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+
+PRODUCT = {
+    "asin": "B000TEST01",
+    "title": "Insulated Water Bottle",
+    "price": 24.99,
+    "rating": 4.5,
+    "total_reviews": 1200,
+    "bsr_rank": 3500,
+    "bsr_category": "Sports & Outdoors",
+}
+
+AI_RESPONSE = """Продукт с устойчивым спросом.
+Возможности:
+- Расширить линейку цветов
+Риски:
+- Сезонность
+Рекомендации:
+- Добавить комплект из двух бутылок
+"""
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def stub_completion(monkeypatch, create):
+    monkeypatch.setattr(main.amazon_analyzer.openai.chat.completions, "create", create)
+
+
+def test_analysis_without_ai_returns_metrics(client):
+    response = client.post("/api/v1/analyze", json={"product": PRODUCT, "include_ai_analysis": False})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["partial"] is False
+    assert body["ai_insights"] is None
+    profit = body["profit_analysis"]
+    assert profit["recommended_price"] > 0
+    assert profit["estimated_monthly_sales"] > 0
+    assert 0 < profit["potential_profit_margin"] < 1
+
+
+def test_analysis_without_optional_fields(client):
+    product = {"asin": "B000TEST02", "title": "Plain product", "price": 9.99}
+    response = client.post("/api/v1/analyze", json={"product": product, "include_ai_analysis": False})
+
+    assert response.status_code == 200
+    assert response.json()["competition_analysis"]["score"] == 0
+
+
+def test_slow_ai_returns_partial_result_within_budget(client, monkeypatch):
+    async def slow_create(**kwargs):
+        await asyncio.sleep(5)
+
+    stub_completion(monkeypatch, slow_create)
+
+    started_at = time.monotonic()
+    response = client.post("/api/v1/analyze", json={"product": PRODUCT, "timeout_ms": 500})
+    elapsed = time.monotonic() - started_at
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["partial"] is True
+    assert body["partial_sections"] == ["ai_insights"]
+    assert body["ai_insights"]["summary"]
+    assert body["profit_analysis"]["recommended_price"] > 0
+    assert elapsed < 2
+
+
+def test_ai_error_is_flagged_as_partial(client, monkeypatch):
+    async def failing_create(**kwargs):
+        raise RuntimeError("upstream unavailable")
+
+    stub_completion(monkeypatch, failing_create)
+
+    response = client.post("/api/v1/analyze", json={"product": PRODUCT})
+
+    assert response.status_code == 200
+    assert response.json()["partial_sections"] == ["ai_insights"]
+
+
+def test_ai_insights_within_budget(client, monkeypatch):
+    async def create(**kwargs):
+        message = SimpleNamespace(content=AI_RESPONSE)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    stub_completion(monkeypatch, create)
+
+    response = client.post("/api/v1/analyze", json={"product": PRODUCT, "timeout_ms": 5000})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["partial"] is False
+    assert body["partial_sections"] == []
+    assert body["ai_insights"]["risks"] == ["Сезонность"]
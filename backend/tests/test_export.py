@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+import asyncio
+
+import pyarrow.dataset as ds
+import pytest
+
+from app.export import AnalysisExporter, AnalysisHistoryReader
+from app.models import AnalysisResponse, CompetitionAnalysis, ProductCreate, ProfitAnalysis
+
+START = datetime(2024, 1, 1)
+
+
+def make_analysis(i, analysis_date=None):
+    product = ProductCreate(asin=f"B{i:09d}", title=f"Product {i}", price=10.0 + i, rating=4.0)
+    response = AnalysisResponse(
+        product_id=i,
+        competition_analysis=CompetitionAnalysis(score=0.5, level="Medium", total_competitors=10, market_saturation=0.5),
+        profit_analysis=ProfitAnalysis(
+            potential_profit_margin=0.3,
+            recommended_price=10.0 + i,
+            estimated_monthly_sales=100,
+            estimated_monthly_revenue=1000.0
+        ),
+        ai_insights=None,
+        analysis_date=analysis_date or START + timedelta(minutes=i),
+        partial=i % 2 == 0,
+        partial_sections=["ai_insights"] if i % 2 == 0 else []
+    )
+    return product, response
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_export_round_trip(tmp_path, file_format):
+    exporter = AnalysisExporter(tmp_path, file_format=file_format, chunk_size=4, compression="zstd")
+
+    assert exporter.export(make_analysis(i) for i in range(10)) == 10
+
+    reader = AnalysisHistoryReader(tmp_path, file_format=file_format)
+    assert len(reader.files()) == 3
+    table = reader.read()
+    assert table.num_rows == 10
+    assert sorted(table.column("asin").to_pylist()) == [f"B{i:09d}" for i in range(10)]
+    assert table.column("partial_sections").to_pylist().count(["ai_insights"]) == 5
+
+    batches = list(reader.scan(columns=["asin", "price"], filter=ds.field("price") >= 15))
+    assert all(batch.schema.names == ["asin", "price"] for batch in batches)
+    assert sum(batch.num_rows for batch in batches) == 5
+
+
+def test_incremental_export_skips_already_exported(tmp_path):
+    exporter = AnalysisExporter(tmp_path, file_format="parquet", chunk_size=100)
+
+    assert exporter.export(make_analysis(i) for i in range(5)) == 5
+    assert exporter.export(make_analysis(i) for i in range(8)) == 3
+    assert exporter.last_export_date() == START + timedelta(minutes=7)
+    assert AnalysisHistoryReader(tmp_path, file_format="parquet").read().num_rows == 8
+
+
+def test_live_records_do_not_move_batch_watermark(tmp_path):
+    exporter = AnalysisExporter(tmp_path, file_format="parquet", chunk_size=100)
+    exporter.add(*make_analysis(100, analysis_date=START + timedelta(days=30)))
+    exporter.flush()
+
+    assert exporter.last_export_date() is None
+    assert exporter.export(make_analysis(i) for i in range(5)) == 5
+
+
+def test_record_writes_full_chunk_in_background(tmp_path):
+    exporter = AnalysisExporter(tmp_path, file_format="arrow", chunk_size=2)
+
+    async def handle_requests():
+        for i in range(5):
+            exporter.record(*make_analysis(i))
+        await exporter.wait_pending_writes()
+
+    asyncio.run(handle_requests())
+    exporter.flush()
+
+    assert AnalysisHistoryReader(tmp_path, file_format="arrow").read().num_rows == 5
@@ -0,0 +1,128 @@
+import gzip
+
+import pytest
+
+from app.extraction import AmazonPageExtractor, extract_pages, iter_page_files
+from app.validators import DataValidator
+
+TABLE_PAGE = """<html><head>
+<link rel="canonical" href="https://www.amazon.com/Cafe-Bottle/dp/B0CAFE0001">
+</head><body><div id="dp">
+<span id="productTitle">  Café Bottle – 1L  </span>
+<span class="a-price"><span class="a-offscreen">$1,249.99</span></span>
+<span id="acrPopover" title="4.6 out of 5 stars"></span>
+<span id="acrCustomerReviewText">12,345 ratings</span>
+<div id="feature-bullets"><ul>
+<li>Keeps drinks cold</li>
+<li>Secure transaction</li>
+</ul></div>
+<table id="productDetails_detailBullets_sections1">
+<tr><th>Product Dimensions</th><td>3 x 3 x 10.5 inches</td></tr>
+<tr><th>Item Weight</th><td>1.5 pounds</td></tr>
+<tr><th>Best Sellers Rank</th><td>#1,234 in Sports &amp; Outdoors (See Top 100)</td></tr>
+</table>
+</div></body></html>"""
+
+BULLETS_PAGE = """<html><body><div id="dp">
+<input type="hidden" id="ASIN" value="B0BULLET01">
+<span id="productTitle">Camping Lantern</span>
+<span id="priceblock_ourprice">$24.50</span>
+<div id="detailBullets_feature_div"><ul>
+<li><span>Package Dimensions : 20 x 10 x 5 cm</span></li>
+<li><span>Item Weight : 12 ounces</span></li>
+<li><span>Best Sellers Rank: #56 in Home &amp; Kitchen</span></li>
+</ul></div>
+</div></body></html>"""
+
+
+@pytest.fixture
+def extractor():
+    return AmazonPageExtractor()
+
+
+def test_extracts_table_details_and_canonical_url(extractor):
+    product = extractor.extract(TABLE_PAGE.encode("utf-8"))
+
+    assert product.asin == "B0CAFE0001"
+    assert product.url == "https://www.amazon.com/Cafe-Bottle/dp/B0CAFE0001"
+    assert product.title == "Café Bottle – 1L"
+    assert product.price == 1249.99
+    assert product.rating == 4.6
+    assert product.total_reviews == 12345
+    assert product.features == ["Keeps drinks cold"]
+    assert product.bsr_rank == 1234
+    assert product.bsr_category == "Sports & Outdoors"
+    assert product.dimensions == {"length": 3.0, "width": 3.0, "height": 10.5}
+    assert product.weight == 1.5
+
+
+def test_extracts_detail_bullets_with_unit_conversion(extractor):
+    product = extractor.extract(BULLETS_PAGE.encode("utf-8"), url="https://www.amazon.com/dp/B0BULLET01")
+
+    assert product.asin == "B0BULLET01"
+    assert product.url == "https://www.amazon.com/dp/B0BULLET01"
+    assert product.price == 24.5
+    assert product.bsr_rank == 56
+    assert product.bsr_category == "Home & Kitchen"
+    assert product.dimensions == pytest.approx({"length": 7.874, "width": 3.937, "height": 1.9685}, abs=1e-4)
+    assert product.weight == 0.75
+
+
+def test_declared_legacy_encoding_is_respected(extractor):
+    page = TABLE_PAGE.replace("<head>", '<head><meta charset="windows-1252">')
+
+    assert extractor.extract(page.encode("cp1252")).title == "Café Bottle – 1L"
+
+
+@pytest.mark.parametrize("content", [b"", b"<html><body><h1>Search results</h1></body></html>"])
+def test_non_product_pages_are_skipped(extractor, content):
+    assert extractor.extract(content) is None
+
+
+@pytest.mark.parametrize("weight, pounds", [
+    ("Item Weight 12 ounces", 0.75),
+    ("8 oz", 0.5),
+    ("2.2 Pounds", 2.2),
+    ("1 lbs", 1.0),
+    ("unknown", None),
+])
+def test_clean_weight_converts_to_pounds(weight, pounds):
+    assert DataValidator.clean_weight(weight) == pounds
+
+
+def write_page(path, asin, compress=False):
+    page = BULLETS_PAGE.replace("B0BULLET01", asin).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if compress:
+        with gzip.open(path, "wb") as output:
+            output.write(page)
+    else:
+        path.write_bytes(page)
+
+
+def test_iter_page_files_walks_plain_and_gzip_pages(tmp_path):
+    write_page(tmp_path / "b" / "page2.html.gz", "B000000002", compress=True)
+    write_page(tmp_path / "a" / "page1.htm", "B000000001")
+    write_page(tmp_path / "page0.html", "B000000000")
+    (tmp_path / "notes.txt").write_text("not a page")
+
+    paths = [path.relative_to(tmp_path).as_posix() for path in iter_page_files(tmp_path)]
+
+    assert paths == ["page0.html", "a/page1.htm", "b/page2.html.gz"]
+
+
+def test_parallel_extraction_keeps_input_order(tmp_path):
+    paths = []
+    for i in range(12):
+        compress = i % 2 == 0
+        path = tmp_path / (f"page{i:02d}.html.gz" if compress else f"page{i:02d}.html")
+        write_page(path, f"B{i:09d}", compress=compress)
+        paths.append(path)
+    (tmp_path / "broken.html").write_bytes(b"<html><body>nothing</body></html>")
+    paths.insert(5, tmp_path / "broken.html")
+
+    results = list(extract_pages(paths, workers=2, chunksize=2))
+
+    assert [path for path, _ in results] == [str(path) for path in paths]
+    assert results[5][1] is None
+    assert [product.asin for _, product in results if product] == [f"B{i:09d}" for i in range(12)]
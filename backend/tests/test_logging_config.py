@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+import io
+import json
+import logging
+import queue
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.config import settings
+from app.logging_config import (
+    LazyQueueHandler,
+    SuccessSamplingFilter,
+    setup_logging,
+    stop_logging,
+)
+
+
+def make_record(level=logging.INFO, msg="done %s", args=("A",), **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    setup_logging(
+        SimpleNamespace(
+            LOG_LEVEL="INFO",
+            LOG_FORMAT=settings.LOG_FORMAT,
+            LOG_FILE="",
+            LOG_STRUCTURED=True,
+            LOG_SUCCESS_SAMPLE_RATE=1.0
+        ),
+        stream=stream
+    )
+    yield stream
+    setup_logging(settings)
+
+
+def read_records(stream):
+    # Остановка listener дописывает очередь в поток
+    stop_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_sampling_drops_only_sampled_success_records():
+    sampling = SuccessSamplingFilter(rate=0.0)
+
+    assert not sampling.filter(make_record(sample=True))
+    assert sampling.filter(make_record())
+    assert sampling.filter(make_record(level=logging.WARNING, sample=True))
+    assert SuccessSamplingFilter(rate=1.0).filter(make_record(sample=True))
+
+
+def test_prepare_snapshots_message_and_extra():
+    log_queue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+    items = ["before"]
+    timings = {"total": 1.0}
+
+    handler.handle(make_record(msg="items %s", args=(items,), timings=timings))
+    items[0] = "after"
+    timings["total"] = 2.0
+
+    record = log_queue.get_nowait()
+    assert record.getMessage() == "items ['before']"
+    assert record.args is None
+    assert record.timings == {"total": 1.0}
+
+
+def test_request_id_reaches_log_records(log_stream):
+    product = {"asin": "B000TEST01", "title": "Test product", "price": 19.99}
+    response = TestClient(main.app).post(
+        "/api/v1/analyze",
+        json={"product": product, "include_ai_analysis": False},
+        headers={"X-Request-ID": "req-123"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "req-123"
+    completed = [record for record in read_records(log_stream) if record["logger"] == "app.main"]
+    assert completed[-1]["request_id"] == "req-123"
+    assert completed[-1]["asin"] == "B000TEST01"
+    assert "sample" not in completed[-1]
+
+
+def test_generated_request_id_is_returned():
+    response = TestClient(main.app).get("/api/v1/health")
+
+    assert len(response.headers["X-Request-ID"]) == 32
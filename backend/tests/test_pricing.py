@@ -0,0 +1,76 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.pricing import PriceOptimizer
+
+
+def make_item(asin, price, category="Electronics", **product):
+    return {"product": {"asin": asin, "title": "Test product", "price": price, "bsr_category": category, **product}}
+
+
+@pytest.mark.parametrize("category", ["Electronics", "Toys & Games", "default"])
+@pytest.mark.parametrize("price", [8, 20, 60, 100, 200, 1000])
+def test_optimal_price_is_not_pinned_to_grid_edges(category, price):
+    curve = PriceOptimizer().sweep([make_item("A", price, category)], points=2000)[0]
+
+    assert curve["prices"][0] < curve["optimal_price"] < curve["prices"][-1]
+
+
+def test_optimal_price_depends_on_product_data():
+    items = [
+        make_item("weak", 50, rating=3.2, total_reviews=5, bsr_rank=90000),
+        make_item("strong", 50, rating=4.8, total_reviews=20000, bsr_rank=500),
+    ]
+    weak, strong = PriceOptimizer().sweep(items, points=2000, include_curve=False)
+
+    assert strong["optimal_price"] > weak["optimal_price"]
+
+
+def test_sweep_rejects_too_many_points():
+    with pytest.raises(ValueError):
+        PriceOptimizer().sweep([make_item("A", 20)], points=10 ** 6)
+
+
+def test_price_max_below_default_range_is_respected():
+    curve = PriceOptimizer().sweep([make_item("A", 20)], points=5, price_max=5)[0]
+
+    assert curve["prices"][-1] == 5
+    assert curve["prices"][0] < curve["prices"][-1]
+    assert all(price <= 5 for price in curve["prices"])
+
+
+def test_price_min_above_default_range_is_respected():
+    curve = PriceOptimizer().sweep([make_item("A", 20)], points=5, price_min=100)[0]
+
+    assert curve["prices"][0] == 100
+    assert curve["prices"][-1] == 400
+    assert all(price >= 100 for price in curve["prices"])
+
+
+def test_single_bound_keeps_default_for_other_side():
+    curve = PriceOptimizer().sweep([make_item("A", 20)], points=5, price_max=30)[0]
+
+    assert curve["prices"] == [10.0, 15.0, 20.0, 25.0, 30.0]
+
+
+@pytest.mark.parametrize("price", [-5, 0, 1e308])
+def test_sweep_endpoint_rejects_invalid_prices(price):
+    item = make_item("A", price)
+    response = TestClient(main.app).post("/api/v1/pricing/sweep", json={"items": [item]})
+
+    assert response.status_code == 422
+
+
+def test_sweep_endpoint_rejects_inverted_bounds():
+    request = {"items": [make_item("A", 20)], "price_min": 50, "price_max": 10}
+    response = TestClient(main.app).post("/api/v1/pricing/sweep", json=request)
+
+    assert response.status_code == 400
+
+
+def test_sweep_endpoint_reports_server_errors_as_500(monkeypatch):
+    monkeypatch.setattr(main.price_optimizer, "sweep", lambda *args, **kwargs: [{"asin": "A"}])
+    response = TestClient(main.app).post("/api/v1/pricing/sweep", json={"items": [make_item("A", 20)]})
+
+    assert response.status_code == 500
@@ -10,7 +10,8 @@ let apiConnectionState = {
 const config = {
     apiUrl: 'http://localhost:8000',
     connectionCheckInterval: 30000, // 30 секунд
-    maxRetries: 3
+    maxRetries: 3,
+    requestTimeoutMs: 20000 // общий бюджет времени на запрос, включая повторы
 };
 
 // Проверка соединения с API
@@ -59,11 +60,14 @@ chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
 
 // Обработка запросов к API
 async function makeApiRequest(endpoint, method = 'GET', data = null) {
+    const deadline = Date.now() + config.requestTimeoutMs;
+
     const retryOperation = async (operation, retries) => {
         try {
             return await operation();
         } catch (error) {
-            if (retries > 0) {
+            // Не повторяем запрос, если бюджет времени исчерпан
+            if (retries > 0 && deadline - Date.now() > 1000) {
                 await new Promise(resolve => setTimeout(resolve, 1000));
                 return retryOperation(operation, retries - 1);
             }
@@ -72,18 +76,29 @@ async function makeApiRequest(endpoint, method = 'GET', data = null) {
     };
 
     const fetchOperation = async () => {
+        const remainingMs = Math.max(deadline - Date.now(), 0);
+        const controller = new AbortController();
+        const timer = setTimeout(() => controller.abort(), remainingMs);
+
         const options = {
             method,
             headers: {
                 'Content-Type': 'application/json',
-            }
+                'X-Request-Timeout-Ms': String(remainingMs)
+            },
+            signal: controller.signal
         };
 
         if (data) {
             options.body = JSON.stringify(data);
         }
 
-        const response = await fetch(`${config.apiUrl}${endpoint}`, options);
+        let response;
+        try {
+            response = await fetch(`${config.apiUrl}${endpoint}`, options);
+        } finally {
+            clearTimeout(timer);
+        }
 
         if (!response.ok) {
             throw new Error(`API request failed: ${response.statusText}`);